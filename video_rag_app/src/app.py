@@ -1,20 +1,24 @@
+import json
 import logging
 import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import streamlit as st
 import yaml
-from inference import InferenceProcessor
-from retriever import VideoRetriever
 from utils.helpers import cleanup_data_directories
 from utils.logger import setup_logger
-from video_indexer import VideoIndexer
 from video_processor import VideoProcessor
 
 # Setup logger
 logger = setup_logger()
 
+# Prefer the libyaml-backed loader; PyYAML builds without libyaml only ship
+# the pure-Python SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # Custom CSS styling
 STYLE = """
 <style>
@@ -29,11 +33,21 @@ STYLE = """
 </style>
 """
 
+# Status line rendered by the processing/query progress logs
+_LOG_BOX_FMT = '<div class="log-box">📌 {}</div>'
+
 
-def load_config():
+def load_config(config_path="config/config.yaml"):
     """
     Load and parse the application configuration from the YAML file.
 
+    The parsed result is cached per process and keyed on the file's
+    modification time, so Streamlit reruns reuse it while edits to the
+    file are still picked up.
+
+    Args:
+        config_path (str): Path to the YAML configuration file
+
     Returns:
         dict: Configuration dictionary containing all settings from config.yaml
 
@@ -41,14 +55,35 @@ def load_config():
         FileNotFoundError: If config.yaml is not found in the config directory
         yaml.YAMLError: If the YAML file is malformed or cannot be parsed
     """
-    config_path = "config/config.yaml"
+    try:
+        mtime = os.path.getmtime(config_path)
+    except FileNotFoundError:
+        logger.error(f"Configuration file not found at {config_path}")
+        raise
+
+    return _load_config_cached(config_path, mtime)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_config_cached(config_path, mtime):
+    # A JSON copy of the parsed YAML is kept next to it and reused on later
+    # starts for as long as it is not older than the YAML source
+    cache_path = Path(config_path).with_suffix(".cache.json")
+    try:
+        if os.path.getmtime(cache_path) >= mtime:
+            with open(cache_path, "r") as cache_file:
+                config = json.load(cache_file)
+                logger.debug(f"Loaded cached configuration from {cache_path}")
+                return config
+    except (OSError, ValueError):
+        pass
+
     logger.info(f"Loading configuration from {config_path}")
 
     try:
         with open(config_path, "r") as config_file:
-            config = yaml.safe_load(config_file)
+            config = yaml.load(config_file, Loader=_YAML_LOADER)
             logger.debug(f"Successfully loaded configuration: {config}")
-            return config
     except FileNotFoundError:
         logger.error(f"Configuration file not found at {config_path}")
         raise
@@ -56,6 +91,41 @@ def load_config():
         logger.error(f"Error parsing YAML configuration: {str(e)}")
         raise
 
+    try:
+        with open(cache_path, "w") as cache_file:
+            json.dump(config, cache_file)
+    except (OSError, TypeError) as e:
+        logger.warning(f"Could not write configuration cache {cache_path}: {str(e)}")
+
+    return config
+
+
+@st.cache_resource(show_spinner=False)
+def _make_inference(api_key):
+    """Build the Gemini interface once per API key and share it across reruns."""
+    # Imported lazily: pulls in google.generativeai
+    from inference import InferenceProcessor
+
+    logger.info("Creating InferenceProcessor")
+    return InferenceProcessor(api_key)
+
+
+@st.cache_resource(show_spinner=False)
+def _make_indexer(config):
+    """Build the VideoIndexer once per configuration and share it across reruns."""
+    # Imported lazily: pulls in llama_index, qdrant and the embedding stack
+    from video_indexer import VideoIndexer
+
+    logger.info("Creating VideoIndexer")
+    return VideoIndexer(config)
+
+
+def format_duration(seconds):
+    """Convert a duration in whole seconds to minutes:seconds format."""
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes}:{seconds:02d}"
+
+
 def init_session_state():
     """
     Initialize the Streamlit session state with required keys and default values.
@@ -90,7 +160,7 @@ def init_session_state():
 
 def main():
 
-    st = time.time()
+    start_time = time.time()
 
     logger.info("Starting Video RAG System application + Builtin Voice Mode Activated")
     st.set_page_config(page_title="Video RAG System", layout="wide", page_icon="🎥")
@@ -100,10 +170,15 @@ def main():
     logger.debug("Initializing session state")
     init_session_state()
 
+    # Load configuration
+    logger.debug("Loading configuration from YAML")
+    config = load_config()
+
     # API Key Popup
     if not st.session_state.gemini_key:
         logger.info("No Gemini API key found - displaying key input form")
-        with st.container():
+        key_popup = st.empty()
+        with key_popup.container():
             st.markdown("<div class='api-key-popup'>", unsafe_allow_html=True)
             st.header("🔑 Gemini API Key Required")
             api_key = st.text_input(
@@ -115,22 +190,22 @@ def main():
                     if api_key:
                         logger.info("API key submitted successfully")
                         st.session_state.gemini_key = api_key
-                        st.rerun()
                     else:
                         logger.warning("Empty API key submitted")
                         st.error("Please enter a valid API key")
             st.markdown("</div>", unsafe_allow_html=True)
+
+        if not st.session_state.gemini_key:
             st.stop()  # Stop execution until key is entered
 
-    # Load configuration
-    logger.debug("Loading configuration from YAML")
-    config = load_config()
+        # Key accepted - clear the form and carry on with this run
+        key_popup.empty()
 
     # Initialize InferenceProcessor
     if st.session_state.inference_processor is None:
         try:
             logger.info("Initializing InferenceProcessor")
-            st.session_state.inference_processor = InferenceProcessor(
+            st.session_state.inference_processor = _make_inference(
                 st.session_state.gemini_key
             )
         except Exception as e:
@@ -144,12 +219,20 @@ def main():
     if st.sidebar.button("🧹 Cleanup All Data"):
         try:
             logger.info("Starting cleanup of data directories")
-            with st.spinner("Cleaning up previous data..."):
-                cleanup_data_directories()
             # Reset only processing-related states
             reset_keys = ["video_url", "index", "retriever", "video_id"]
             for key in reset_keys:
                 st.session_state[key] = None
+            with st.spinner("Cleaning up previous data..."):
+                # Release the cached Qdrant client before deleting its storage.
+                # The client and the data are shared by every session, so other
+                # sessions' retrievers stop working too and need a re-process.
+                # Nothing to close if no indexer was ever built; skip the
+                # import so llama_index and qdrant stay unloaded.
+                if "video_indexer" in sys.modules:
+                    _make_indexer.clear()
+                    sys.modules["video_indexer"].close_qdrant_clients()
+                cleanup_data_directories()
             logger.info("Cleanup completed successfully")
             st.success("All previous data cleaned successfully!")
         except Exception as e:
@@ -166,6 +249,8 @@ def main():
         process_button = st.button("🚀 Process Video")
 
     if process_button and video_url:
+        from retriever import VideoRetriever
+
         logger.info(f"Starting video processing for URL: {video_url}")
         try:
             status_container = st.container()
@@ -177,9 +262,7 @@ def main():
 
             def update_log(message):
                 logger.debug(f"Processing status: {message}")
-                log_box.markdown(
-                    f'<div class="log-box">📌 {message}</div>', unsafe_allow_html=True
-                )
+                log_box.markdown(_LOG_BOX_FMT.format(message), unsafe_allow_html=True)
 
             with st.spinner("Processing video..."):
                 update_log("Initializing video processor...")
@@ -202,29 +285,36 @@ def main():
 
                 progress_bar.progress(25)
 
-                # Convert duration to minutes:seconds format
-                def format_duration(seconds):
-                    return f"{seconds//60}:{seconds%60:02d}"
-
                 video_duration = format_duration(metadata.duration)
                 update_log(
                     f"Download complete: {video_path.name} - Duration: {video_duration}"
                 )
 
-                update_log("Extracting frames from video...")
-                frames_dir = video_processor.extract_frames(video_path)
-                progress_bar.progress(50)
-                update_log(f"Extracted {len(list(frames_dir.glob('*.jpg')))} frames")
+                # Captions arrive with the download, so frames and captions
+                # are extracted in parallel; Streamlit updates stay on this
+                # (the script) thread
+                update_log("Extracting frames and captions...")
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    frames_future = executor.submit(
+                        video_processor.extract_frames, video_path
+                    )
+                    captions_future = executor.submit(video_processor.extract_captions)
+
+                    captions_path = captions_future.result()
+                    progress_bar.progress(40)
+                    update_log(f"Captions saved to: {captions_path}")
 
-                update_log("Extracting video captions...")
-                captions_path = video_processor.extract_captions()
-                progress_bar.progress(70)
-                update_log(f"Captions saved to: {captions_path}")
+                    frames_dir, frame_paths = frames_future.result()
+                    progress_bar.progress(70)
+                    update_log(f"Extracted {len(frame_paths)} frames")
 
                 update_log("Creating multimodal index...")
-                indexer = VideoIndexer(config)
+                indexer = _make_indexer(config)
                 index = indexer.create_multimodal_index(
-                    frames_dir, captions_path, video_processor.video_id
+                    frames_dir,
+                    captions_path,
+                    video_processor.video_id,
+                    frame_paths=frame_paths,
                 )
                 progress_bar.progress(90)
                 update_log("Index creation complete")
@@ -263,8 +353,7 @@ def main():
                 def update_query_log(message):
                     logger.debug(f"Query processing status: {message}")
                     query_log_box.markdown(
-                        f'<div class="log-box">📌 {message}</div>',
-                        unsafe_allow_html=True,
+                        _LOG_BOX_FMT.format(message), unsafe_allow_html=True
                     )
 
                 with st.spinner("Analyzing query..."):
@@ -305,8 +394,8 @@ def main():
                 logger.error(f"Error processing query: {str(e)}", exc_info=True)
                 st.error(f"❌ Error processing query: {str(e)}")
 
-    et = time.time()
-    print("Time taken - ", round(et - st, 3))
+    end_time = time.time()
+    print("Time taken - ", round(end_time - start_time, 3))
 
 
 if __name__ == "__main__":
@@ -1,11 +1,85 @@
+import io
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import google.generativeai as genai
 from PIL import Image
 
+# Match both start and end timestamps from the caption format written by
+# VideoProcessor.extract_captions: "<s> START | END | caption text </s>"
+# Pattern explanation:
+# <s> * - Match <s> followed by optional spaces
+# ([\d.]+) - Capture group for decimal numbers (start time)
+#  *\| * - Match the separator pipe with optional surrounding spaces
+# ([\d.]+) - Capture group for decimal numbers (end time)
+#  *\| - Match the pipe before the caption text
+# Only spaces are allowed between the parts, so a match never spans lines
+_TIMESTAMP_RE = re.compile(r"<s> *([\d.]+) *\| *([\d.]+) *\|")
+
+# Frames are downscaled to fit this box before being sent to Gemini
+_MAX_IMAGE_SIZE = (1024, 1024)
+
+# Prompt sent to Gemini; only the query and the retrieved context vary
+_PROMPT_TEMPLATE = """ 
+            Analyze the video content and respond to the query provided below:  
+            **Query:** {query}  
+
+            ---
+
+            ### Context from Video  
+            {context}  
+
+            ---
+
+            ### Instructions  
+
+            1. **Focus Areas**:  
+            - Analyze both **visual** (e.g., images, frames) and **textual** (e.g., captions, transcriptions) elements present in the video.  
+
+            2. **Timestamp Conversion**:  
+            - Extract timestamps from frame image names based on the `frame_interval` value defined in the configuration YAML file.  
+            - Convert timestamps to the MM:SS format (e.g., 125 seconds to 2:05).  
+            - Expand each timestamp into a ±20-second range (e.g., 125s becomes 1:45 - 2:25).  
+
+            3. **Output Format Requirements**:  
+            - List all timestamp ranges at the end of your analysis in the following format:  
+                `[Original Time] → [Start Window - End Window]`.  
+
+            ---
+
+            ### Include in the Analysis  
+
+            - **Key Observations**:  
+            - Highlight specific **frames** or **captions** that support your analysis.  
+
+            - **Relevant Visual/Textual Evidence**:  
+            - Identify and detail critical elements (e.g., objects, text on-screen, colors, emotions, actions) that substantiate your findings.  
+
+            - **Relevant Timestamp Windows**:  
+            - Ensure all timestamps are accurately converted to MM:SS format and expanded into ±20-second ranges.  
+
+            ---
+
+            ### Example Output Format  
+
+            Main analysis content...  
+
+            **Relevant Timestamp Windows:**  
+            - 3:45 to 3:25 - 4:05  
+            - 1:10 to 0:50 - 1:30  
+
+            ---
+
+            ### Configuration Information  
+            - **Frame Interval**: 5 seconds  
+
+            ---
+
+            **Answer:**  """
+
 
 class InferenceProcessor:
     def __init__(self, api_key: str):
@@ -50,101 +124,58 @@ class InferenceProcessor:
     #     timestamps = re.findall(timestamp_pattern, text)
     #     return sorted(list(set(timestamps)), key=float)  # Remove duplicates and sort
 
-    def _extract_timestamps(self, text: str) -> List[str]:
+    def _extract_timestamps(self, text: str) -> List[float]:
         """Extract timestamps from the caption text using improved regex pattern matching.
 
         This method processes caption text that contains timestamps in the format:
-        <s>START_TIME: caption text :END_TIME<e>
+        <s> START_TIME | END_TIME | caption text </s>
 
         Args:
             text (str): The caption text containing timestamp markers
 
         Returns:
-            List[str]: A list of timestamp strings, where each timestamp is the
-                      midpoint between the start and end times of a caption segment.
-                      The timestamps are returned as strings to preserve decimal precision.
+            List[float]: A list of timestamps, where each timestamp is the
+                        midpoint between the start and end times of a caption segment.
 
         Example:
-            Input text: "<s>10.5: Some caption text :12.5<e>"
-            Returns: ["11.5"] (average of 10.5 and 12.5)
+            Input text: "<s> 10.50 | 12.50 | Some caption text </s>"
+            Returns: [11.5] (average of 10.5 and 12.5)
         """
-        # Match both start and end timestamps from the caption format
-        # Pattern explanation:
-        # <s>\s* - Match <s> followed by optional whitespace
-        # ([\d.]+) - Capture group for decimal numbers (start time)
-        # \s*: - Match colon with optional surrounding whitespace
-        # .+? - Non-greedy match of caption text
-        # : - Match ending colon
-        # \s*([\d.]+)\s* - Capture group for decimal numbers (end time)
-        # <e> - Match closing tag
-        timestamp_pattern = r"<s>\s*([\d.]+)\s*:.+?:\s*([\d.]+)\s*<e>"
-
-        # Find all matching timestamp pairs in the text
-        matches = re.findall(timestamp_pattern, text)
-
-        # Calculate midpoint timestamps and convert to strings
+        # Calculate midpoint timestamps
         # This gives us a more accurate representation of when the caption appears
-        return [str((float(start) + float(end)) / 2) for start, end in matches]
-
-    def _prepare_prompt(self, query: str, texts: List[str], images) -> str:
-        context = "\n".join(texts[:3])  # Use top 3 most relevant text chunks
-
-        return f""" 
-            Analyze the video content and respond to the query provided below:  
-            **Query:** {query}  
-
-            ---
-
-            ### Context from Video  
-            {context}  
-
-            ---
-
-            ### Instructions  
-
-            1. **Focus Areas**:  
-            - Analyze both **visual** (e.g., images, frames) and **textual** (e.g., captions, transcriptions) elements present in the video.  
-
-            2. **Timestamp Conversion**:  
-            - Extract timestamps from frame image names based on the `frame_interval` value defined in the configuration YAML file.  
-            - Convert timestamps to the MM:SS format (e.g., 125 seconds to 2:05).  
-            - Expand each timestamp into a ±20-second range (e.g., 125s becomes 1:45 - 2:25).  
-
-            3. **Output Format Requirements**:  
-            - List all timestamp ranges at the end of your analysis in the following format:  
-                `[Original Time] → [Start Window - End Window]`.  
-
-            ---
-
-            ### Include in the Analysis  
-
-            - **Key Observations**:  
-            - Highlight specific **frames** or **captions** that support your analysis.  
-
-            - **Relevant Visual/Textual Evidence**:  
-            - Identify and detail critical elements (e.g., objects, text on-screen, colors, emotions, actions) that substantiate your findings.  
-
-            - **Relevant Timestamp Windows**:  
-            - Ensure all timestamps are accurately converted to MM:SS format and expanded into ±20-second ranges.  
-
-            ---
-
-            ### Example Output Format  
-
-            Main analysis content...  
-
-            **Relevant Timestamp Windows:**  
-            - 3:45 to 3:25 - 4:05  
-            - 1:10 to 0:50 - 1:30  
+        return [
+            (float(start) + float(end)) * 0.5
+            for start, end in _TIMESTAMP_RE.findall(text)
+        ]
 
-            ---
+    def _load_image(self, img_path: Path) -> Optional[Dict[str, Any]]:
+        """Downscale an image and encode it as a JPEG part for Gemini.
 
-            ### Configuration Information  
-            - **Frame Interval**: 5 seconds  
+        The bytes are produced once here, so the SDK does not re-encode the
+        PIL image when building (or retrying) the request.
 
-            ---
+        Returns:
+            Optional[Dict[str, Any]]: A ``{"mime_type", "data"}`` blob part,
+                                      or None if the image cannot be read.
+        """
+        try:
+            img = Image.open(str(img_path))
+            # Let libjpeg downscale while decoding (no-op for other formats)
+            img.draft("RGB", _MAX_IMAGE_SIZE)
+            img.thumbnail(_MAX_IMAGE_SIZE, Image.Resampling.BILINEAR)
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+
+            buffer = io.BytesIO()
+            img.save(buffer, "JPEG", quality=85)
+            return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
+        except Exception as e:
+            self.logger.warning(f"Failed to load image {img_path}: {e}")
+            return None
 
-            **Answer:**  """
+    def _prepare_prompt(self, query: str, texts: List[str], images) -> str:
+        context = "\n".join(texts[:3])  # Use top 3 most relevant text chunks
+        return _PROMPT_TEMPLATE.format(query=query, context=context)
 
     def process_query(
         self, retrieved_images: List[Path], retrieved_texts: List[str], query: str
@@ -152,33 +183,32 @@ class InferenceProcessor:
         try:
             self.logger.info(f"Processing query: {query}")
 
-            # Prepare images
-            images = []
-            for img_path in retrieved_images[
-                :5
-            ]:  # Limit to 5 images to avoid token limits
-                try:
-                    img = Image.open(str(img_path))
-                    images.append(img)
-                except Exception as e:
-                    self.logger.warning(f"Failed to load image {img_path}: {e}")
+            # Prepare images, encoding them in parallel
+            image_paths = retrieved_images[:5]  # Limit to 5 images to avoid token limits
+            image_parts = []
+            if image_paths:
+                with ThreadPoolExecutor(max_workers=len(image_paths)) as executor:
+                    image_parts = [
+                        part
+                        for part in executor.map(self._load_image, image_paths)
+                        if part is not None
+                    ]
 
             # Prepare prompt
             prompt = self._prepare_prompt(query, retrieved_texts, retrieved_images)
 
             # Generate response
-            response = self.model.generate_content([prompt] + images)
+            response = self.model.generate_content([prompt] + image_parts)
 
-            # Extract timestamps from all texts
-            all_timestamps = []
-            for text in retrieved_texts:
-                all_timestamps.extend(self._extract_timestamps(text))
+            # Extract timestamps from all texts in a single scan; the pattern
+            # cannot match across a newline, so joining keeps texts separate
+            all_timestamps = self._extract_timestamps("\n".join(retrieved_texts))
 
             # Format response
             result = {
                 "answer": response.text,
                 "source_images": [str(path) for path in retrieved_images[:5]],
-                "timestamps": sorted(set(all_timestamps), key=float),
+                "timestamps": [f"{t:.3f}" for t in sorted(set(all_timestamps))],
             }
 
             self.logger.info("Successfully processed query")
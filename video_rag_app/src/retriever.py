@@ -12,20 +12,39 @@ class VideoRetriever:
             similarity_top_k=5, image_similarity_top_k=5
         )
         self.logger = logging.getLogger(__name__)
+        # Multimodal retrievers can query each modality on its own
+        self._split_retrieval = hasattr(
+            self.retriever_engine, "text_retrieve"
+        ) and hasattr(self.retriever_engine, "text_to_image_retrieve")
 
     def retrieve(self, query_str: str) -> Tuple[List[Path], List[str]]:
         try:
             self.logger.info(f"Processing query: {query_str}")
-            retrieval_results = self.retriever_engine.retrieve(query_str)
-
-            retrieved_images = []
-            retrieved_texts = []
-
-            for res_node in retrieval_results:
-                if isinstance(res_node.node, ImageNode):
-                    retrieved_images.append(Path(res_node.node.metadata["file_path"]))
-                else:
-                    retrieved_texts.append(res_node.text)
+            if self._split_retrieval:
+                # Query the text and image stores separately so the results
+                # arrive already split by modality
+                text_results = self.retriever_engine.text_retrieve(query_str)
+                image_results = self.retriever_engine.text_to_image_retrieve(
+                    query_str
+                )
+                retrieved_images = [
+                    Path(res_node.node.metadata["file_path"])
+                    for res_node in image_results
+                ]
+                retrieved_texts = [res_node.text for res_node in text_results]
+            else:
+                retrieval_results = self.retriever_engine.retrieve(query_str)
+
+                retrieved_images = []
+                retrieved_texts = []
+
+                for res_node in retrieval_results:
+                    if isinstance(res_node.node, ImageNode):
+                        retrieved_images.append(
+                            Path(res_node.node.metadata["file_path"])
+                        )
+                    else:
+                        retrieved_texts.append(res_node.text)
 
             self.logger.info(
                 f"Retrieved {len(retrieved_images)} images and {len(retrieved_texts)} text segments"
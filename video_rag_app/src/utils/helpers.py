@@ -1,6 +1,7 @@
 import logging
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -14,16 +15,19 @@ def cleanup_data_directories():
     try:
         logger.info("Starting cleanup of data directories...")
 
-        for dir_path in dirs_to_clean:
+        def _remove(dir_path):
             path = Path(dir_path)
             if path.exists():
                 logger.info(f"Cleaning directory: {dir_path}")
                 shutil.rmtree(path)
-                # Recreate empty directory
-                path.mkdir(parents=True, exist_ok=True)
-            else:
-                logger.info(f"Creating directory: {dir_path}")
-                path.mkdir(parents=True, exist_ok=True)
+
+        # Removing large directories is I/O bound, so clear them in parallel
+        with ThreadPoolExecutor(max_workers=len(dirs_to_clean)) as executor:
+            list(executor.map(_remove, dirs_to_clean))
+
+        # Recreate empty directories
+        for dir_path in dirs_to_clean:
+            Path(dir_path).mkdir(parents=True, exist_ok=True)
 
         logger.info("Cleanup completed successfully")
 
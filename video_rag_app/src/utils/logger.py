@@ -1,5 +1,7 @@
 import logging
+import os
 import sys
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 
@@ -8,8 +10,19 @@ def setup_logger():
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
 
+    log_file = os.path.abspath(log_dir / "app.log")
+
     # Configure logger
     logger = logging.getLogger()
+
+    # Streamlit may import this module again on reload; attach handlers once
+    for handler in logger.handlers:
+        if (
+            isinstance(handler, RotatingFileHandler)
+            and handler.baseFilename == log_file
+        ):
+            return logger
+
     logger.setLevel(logging.INFO)
 
     # Console handler
@@ -22,8 +35,10 @@ def setup_logger():
     console_handler.setFormatter(console_formatter)
     logger.addHandler(console_handler)
 
-    # File handler
-    file_handler = logging.FileHandler("logs/app.log")
+    # File handler, rotated so long-running sessions don't grow it unbounded
+    file_handler = RotatingFileHandler(
+        log_file, maxBytes=10_000_000, backupCount=3
+    )
     file_handler.setLevel(logging.DEBUG)
     file_formatter = logging.Formatter(
         "%(asctime)s | %(levelname)s | %(name)s | %(funcName)s:%(lineno)d - %(message)s",
@@ -1,26 +1,61 @@
+import functools
 import logging
 from pathlib import Path
+from typing import Dict, List, Optional
 
 import qdrant_client
 from llama_index.core import Settings, SimpleDirectoryReader, StorageContext
 from llama_index.core.indices import MultiModalVectorStoreIndex
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.vector_stores.qdrant import QdrantVectorStore
 
 
+@functools.lru_cache(maxsize=1)
+def _get_embed_model(model_name: str):
+    # Loading the HuggingFace weights is slow and memory heavy, so every
+    # VideoIndexer using the same model shares a single instance. The import
+    # is deferred as it pulls in torch and transformers.
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    return HuggingFaceEmbedding(model_name=model_name)
+
+
+# Opening an on-disk Qdrant store is expensive and locks the directory, so a
+# single client is shared per storage path
+_qdrant_clients: Dict[str, qdrant_client.QdrantClient] = {}
+
+
+def _get_qdrant_client(path: str) -> qdrant_client.QdrantClient:
+    client = _qdrant_clients.get(path)
+    if client is None:
+        client = _qdrant_clients[path] = qdrant_client.QdrantClient(path=path)
+    return client
+
+
+def close_qdrant_clients() -> None:
+    """Close the shared Qdrant clients so their storage can be deleted."""
+    while _qdrant_clients:
+        _, client = _qdrant_clients.popitem()
+        client.close()
+
+
 class VideoIndexer:
     def __init__(self, config: dict):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        Settings.embed_model = HuggingFaceEmbedding(
-            model_name=self.config["embed_model"]
-        )
+        self._client = None
+        Settings.embed_model = _get_embed_model(self.config["embed_model"])
+
+    @property
+    def client(self) -> qdrant_client.QdrantClient:
+        if self._client is None:
+            self._client = _get_qdrant_client(
+                str(Path(self.config["indexing_path"]))
+            )
+        return self._client
 
     def _index_exists(self, video_id: str) -> bool:
         try:
-            client = qdrant_client.QdrantClient(
-                path=str(Path(self.config["indexing_path"]))
-            )
+            client = self.client
             collections = client.get_collections()
             expected_collections = {f"text_{video_id}", f"image_{video_id}"}
             existing_collections = {col.name for col in collections.collections}
@@ -40,14 +75,16 @@ class VideoIndexer:
             return False
 
     def create_multimodal_index(
-        self, frames_dir: Path, captions_path: Path, video_id: str
+        self,
+        frames_dir: Path,
+        captions_path: Path,
+        video_id: str,
+        frame_paths: Optional[List[Path]] = None,
     ) -> MultiModalVectorStoreIndex:
         try:
             self.logger.info("Creating new multimodal index...")
 
-            client = qdrant_client.QdrantClient(
-                path=str(Path(self.config["indexing_path"]))
-            )
+            client = self.client
 
             # Create vector stores for text and images
             text_store = QdrantVectorStore(
@@ -62,8 +99,15 @@ class VideoIndexer:
                 vector_store=text_store, image_store=image_store
             )
 
-            # Load documents (frames and captions)
-            documents = SimpleDirectoryReader(str(frames_dir)).load_data()
+            # Load documents (frames and captions), using the frame manifest
+            # when available to avoid walking the directory
+            if frame_paths is not None:
+                reader = SimpleDirectoryReader(
+                    input_files=[str(path) for path in [*frame_paths, captions_path]]
+                )
+            else:
+                reader = SimpleDirectoryReader(str(frames_dir))
+            documents = reader.load_data()
 
             # Create index
             index = MultiModalVectorStoreIndex.from_documents(
@@ -82,9 +126,7 @@ class VideoIndexer:
         try:
             self.logger.info(f"Loading existing index for video {video_id}...")
 
-            client = qdrant_client.QdrantClient(
-                path=str(Path(self.config["indexing_path"]))
-            )
+            client = self.client
 
             text_store = QdrantVectorStore(
                 client=client, collection_name=f"text_{video_id}"
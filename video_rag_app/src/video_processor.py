@@ -1,11 +1,30 @@
 import logging
-from dataclasses import dataclass
+import os
+import re
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Tuple
+from typing import Iterator, List, Optional, Tuple
 
+import cv2
+import numpy as np
+import orjson
 import yt_dlp
-from moviepy.video.io.VideoFileClip import VideoFileClip
-from youtube_transcript_api import YouTubeTranscriptApi
+
+# Number of sampled frames decoded per batch when `gpu_decode` is enabled
+_GPU_DECODE_BATCH_SIZE = 32
+
+# Frame rate assumed for videos whose container reports none
+_DEFAULT_FPS = 30.0
+
+# Frames are stored as JPEG: libjpeg-turbo encodes far faster than PNG/zlib
+# and downstream vision models don't need lossless input
+_JPEG_WRITE_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 90, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+
+# YouTube video IDs are 11 URL-safe base64 characters
+_YT_ID_RE = re.compile(r"(?:[?&]v=|youtu\.be/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])")
 
 
 @dataclass
@@ -20,35 +39,112 @@ class VideoMetadata:
     video_id: str
 
 
+class _FrameFileWriter:
+    """Writes the frames sampled by VideoProcessor.extract_frames as JPEG files.
+
+    Encoding and writing run on a thread pool (cv2.imencode releases the GIL)
+    while the caller keeps decoding; at most a couple of frames per worker are
+    queued.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.frame_paths: List[Path] = []
+        self.frame_count = 0
+        self._max_workers = os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        self._pending = deque()
+
+    def write(self, frame: np.ndarray) -> None:
+        frame_path = self.output_dir / f"frame{self.frame_count:04d}.jpg"
+        # Copy, as the decoder may reuse the frame buffer
+        self._pending.append(
+            (frame_path, self._executor.submit(self._save, frame_path, frame.copy()))
+        )
+        self.frame_count += 1
+
+        while len(self._pending) > 2 * self._max_workers:
+            self._collect_next()
+
+    def _save(self, frame_path: Path, frame: np.ndarray) -> None:
+        """Runs on a worker thread."""
+        ok, buffer = cv2.imencode(".jpg", frame, _JPEG_WRITE_PARAMS)
+        if not ok:
+            raise IOError(f"Failed to encode frame {frame_path.name}")
+        frame_path.write_bytes(buffer.tobytes())
+
+    def _collect_next(self) -> None:
+        frame_path, future = self._pending.popleft()
+        future.result()
+        self.frame_paths.append(frame_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                while self._pending:
+                    self._collect_next()
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+
 class VideoProcessor:
     def __init__(self, url: str, config: dict):
         self.url = url
         self.config = config
-        self.video_id = self._extract_video_id(url)
         self.logger = logging.getLogger(__name__)
+        self.video_id = self._extract_video_id(url)
+        self.video_dir = Path(config["video_dir"])
+        self.data_dir = Path(config["data_dir"])
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        # Written by yt-dlp next to the video during download_video
+        self.subtitle_path = self.video_dir / f"{self.video_id}.en.json3"
 
     def _extract_video_id(self, url: str) -> str:
-        try:
-            if "?v=" in url:
-                return url.split("?v=")[1].split("&")[0]
-            elif "youtu.be/" in url:
-                return url.split("youtu.be/")[1].split("?")[0]
-            raise ValueError("Invalid YouTube URL format")
-        except Exception as e:
+        match = _YT_ID_RE.search(url)
+        if not match:
             self.logger.error(f"Failed to extract video ID from URL: {url}")
-            raise ValueError(f"Invalid YouTube URL: {e}")
+            raise ValueError(f"Invalid YouTube URL: {url}")
+        return match.group(1)
 
     def download_video(self, progress_callback=None) -> Tuple[VideoMetadata, Path]:
         filename = f"{self.video_id}.mp4"
-        output_path = Path(self.config["video_dir"]) / filename
+        output_path = self.video_dir / filename
+        metadata_path = output_path.with_suffix(".json")
+
+        # Reuse a previous download of this video if it completed
+        cached = self._load_cached_download(output_path, metadata_path)
+        if cached is not None:
+            return cached, output_path
 
+        # Only frames are used downstream (captions come with the subtitles),
+        # so fetch a single video-only stream and skip the audio merge
+        max_height = self.config.get("max_height", 720)
         ydl_opts = {
-            "format": "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
+            "format": (
+                f"bestvideo[ext=mp4][height<={max_height}]"
+                f"/best[ext=mp4][height<={max_height}]/best[ext=mp4]/best"
+            ),
             "outtmpl": str(output_path),
             "quiet": False,
             "no_warnings": True,
             "progress_hooks": [self._progress_hook],
+            # Fetch English captions in the same call; see extract_captions
+            "writesubtitles": True,
+            "writeautomaticsub": True,
+            "subtitleslangs": ["en"],
+            "subtitlesformat": "json3",
+            # Fetch DASH/HLS fragments over several connections at once
+            "concurrent_fragment_downloads": self.config.get(
+                "concurrent_fragments", 8
+            ),
         }
+        if self.config.get("use_aria2c"):
+            # aria2c is an external binary and must be installed separately
+            ydl_opts["external_downloader"] = "aria2c"
+            ydl_opts["external_downloader_args"] = ["-x16", "-s16"]
 
         self._progress_callback = progress_callback
 
@@ -63,9 +159,11 @@ class VideoProcessor:
                     f"Download failed - no file created at {output_path}"
                 )
 
-            # Get video duration
-            with VideoFileClip(str(output_path)) as clip:
-                duration = int(clip.duration)
+            # Get video duration from the download metadata, probing the
+            # file only if yt-dlp did not report it
+            duration = int(info.get("duration") or 0)
+            if not duration:
+                duration = self._probe_duration(output_path)
 
             metadata = VideoMetadata(
                 title=info.get("title", "Unknown"),
@@ -77,6 +175,7 @@ class VideoProcessor:
                 resolution=f"{info.get('width', 'Unknown')}x{info.get('height', 'Unknown')}",
                 video_id=self.video_id,
             )
+            metadata_path.write_bytes(orjson.dumps(asdict(metadata)))
             return metadata, output_path
         except Exception as e:
             self.logger.error(f"Failed to download video: {str(e)}")
@@ -86,6 +185,54 @@ class VideoProcessor:
         finally:
             self._progress_callback = None
 
+    def _load_cached_download(
+        self, output_path: Path, metadata_path: Path
+    ) -> Optional[VideoMetadata]:
+        if not (
+            output_path.exists()
+            and metadata_path.exists()
+            and self.subtitle_path.exists()
+        ):
+            return None
+        try:
+            metadata = VideoMetadata(**orjson.loads(metadata_path.read_bytes()))
+        except (ValueError, TypeError) as e:
+            self.logger.warning(f"Ignoring unreadable metadata {metadata_path}: {e}")
+            return None
+        self.logger.info(f"Using previously downloaded video: {output_path}")
+        return metadata
+
+    def _probe_duration(self, video_path: Path) -> int:
+        try:
+            result = subprocess.run(
+                [
+                    "ffprobe",
+                    "-v",
+                    "error",
+                    "-show_entries",
+                    "format=duration",
+                    "-of",
+                    "json",
+                    str(video_path),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            return int(float(orjson.loads(result.stdout)["format"]["duration"]))
+        except (OSError, subprocess.CalledProcessError, ValueError, KeyError) as e:
+            # The duration is informational only, so a missing or failing
+            # ffprobe must not throw away the downloaded video
+            self.logger.warning(f"ffprobe failed, estimating duration: {str(e)}")
+
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+            return int(frame_count / fps) if fps > 0 else 0
+        finally:
+            cap.release()
+
     def _progress_hook(self, d):
         if self._progress_callback:
             status = ""
@@ -98,38 +245,181 @@ class VideoProcessor:
             if status:
                 self._progress_callback(status)
 
-    def extract_frames(self, video_path: Path) -> Path:
-        output_dir = Path(self.config["data_dir"])
-        output_dir.mkdir(exist_ok=True)
+    def extract_frames(self, video_path: Path) -> Tuple[Path, List[Path]]:
+        output_dir = self.data_dir
 
         try:
             self.logger.info(f"Extracting frames from video: {video_path}")
-            with VideoFileClip(str(video_path)) as clip:
-                fps = 1 / self.config["frame_interval"]
-                clip.write_images_sequence(str(output_dir / "frame%04d.png"), fps=fps)
-            return output_dir
+            with _FrameFileWriter(output_dir) as writer:
+                for _, frame in self.iter_frames(video_path):
+                    writer.write(frame)
+
+            if writer.frame_count == 0:
+                # e.g. a codec this OpenCV build opens but cannot decode
+                raise IOError(f"No frames could be decoded from {video_path}")
+
+            self.logger.info(f"Extracted {writer.frame_count} frames")
+            return output_dir, writer.frame_paths
         except Exception as e:
             self.logger.error(f"Failed to extract frames: {str(e)}")
             raise
 
+    def iter_frames(self, video_path: Path) -> Iterator[Tuple[float, np.ndarray]]:
+        """Decode the frames sampled every `frame_interval` seconds.
+
+        Frames are yielded as soon as they are decoded, so callers such as an
+        embedding step can consume them without a round trip through disk.
+
+        Args:
+            video_path (Path): Path to the downloaded video file
+
+        Yields:
+            Tuple[float, np.ndarray]: The frame timestamp in seconds and the
+                                      frame as a BGR uint8 array, downscaled
+                                      to fit `frame_size`
+        """
+        if self.config.get("gpu_decode"):
+            try:
+                decoder, stride = self._open_gpu_decoder(video_path)
+            except (ImportError, RuntimeError) as e:
+                self.logger.warning(
+                    f"GPU decoding unavailable, falling back to CPU: {str(e)}"
+                )
+            else:
+                yield from self._iter_frames_gpu(decoder, stride)
+                return
+
+        yield from self._iter_frames_cpu(video_path)
+
+    def _open_capture(self, video_path: Path) -> cv2.VideoCapture:
+        if self.config.get("hw_decode", True) and hasattr(
+            cv2, "CAP_PROP_HW_ACCELERATION"
+        ):
+            # Let FFmpeg use VAAPI/D3D11VA/VideoToolbox where available; it
+            # silently falls back to software decoding otherwise
+            cap = cv2.VideoCapture(
+                str(video_path),
+                cv2.CAP_FFMPEG,
+                [
+                    cv2.CAP_PROP_HW_ACCELERATION,
+                    cv2.VIDEO_ACCELERATION_ANY,
+                    cv2.CAP_PROP_HW_DEVICE,
+                    0,
+                ],
+            )
+            if cap.isOpened():
+                return cap
+            cap.release()
+        return cv2.VideoCapture(str(video_path))
+
+    def _iter_frames_cpu(self, video_path: Path) -> Iterator[Tuple[float, np.ndarray]]:
+        cap = self._open_capture(video_path)
+        try:
+            if not cap.isOpened():
+                raise IOError(f"Could not open video file: {video_path}")
+
+            # Sample one frame every `frame_interval` seconds. grab() only
+            # advances the stream; retrieve() converts just the sampled frames.
+            src_fps = cap.get(cv2.CAP_PROP_FPS)
+            if not src_fps or src_fps <= 0:
+                # Some containers don't report a frame rate; a stride of 1
+                # would dump every frame, so assume a typical rate instead
+                self.logger.warning(
+                    f"Video reports no frame rate, assuming {_DEFAULT_FPS} fps"
+                )
+                src_fps = _DEFAULT_FPS
+            stride = max(1, int(round(src_fps * self.config["frame_interval"])))
+
+            frame_index = 0
+            while cap.grab():
+                if frame_index % stride == 0:
+                    ok, frame = cap.retrieve()
+                    if ok:
+                        yield frame_index / src_fps, self._resize_frame(frame)
+                frame_index += 1
+        finally:
+            cap.release()
+
+    def _open_gpu_decoder(self, video_path: Path):
+        # Optional dependencies, only needed when `gpu_decode` is enabled
+        import torch
+        from torchcodec.decoders import VideoDecoder
+
+        if not torch.cuda.is_available():
+            raise RuntimeError("CUDA is not available")
+
+        # Decoding runs on NVDEC and only the sampled frames are converted
+        decoder = VideoDecoder(str(video_path), device="cuda")
+        metadata = decoder.metadata
+        if not metadata.average_fps or not metadata.num_frames:
+            raise RuntimeError("Video stream is missing fps or frame count metadata")
+
+        stride = max(
+            1, int(round(metadata.average_fps * self.config["frame_interval"]))
+        )
+        return decoder, stride
+
+    def _iter_frames_gpu(
+        self, decoder, stride: int
+    ) -> Iterator[Tuple[float, np.ndarray]]:
+        fps = decoder.metadata.average_fps
+        indices = list(range(0, decoder.metadata.num_frames, stride))
+
+        for start in range(0, len(indices), _GPU_DECODE_BATCH_SIZE):
+            batch_indices = indices[start : start + _GPU_DECODE_BATCH_SIZE]
+            batch = decoder.get_frames_at(batch_indices)
+            # (N, C, H, W) RGB on the GPU -> contiguous (N, H, W, C) BGR on the host
+            frames = batch.data.permute(0, 2, 3, 1).flip(-1).contiguous().cpu().numpy()
+            for frame_index, frame in zip(batch_indices, frames):
+                yield frame_index / fps, self._resize_frame(frame)
+
+    def _resize_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale a frame to fit within `frame_size`, keeping its aspect ratio.
+
+        Frames already small enough, or every frame when `frame_size` is
+        null, are returned unchanged.
+        """
+        frame_size = self.config.get("frame_size", (384, 384))
+        if frame_size is None:
+            return frame
+
+        height, width = frame.shape[:2]
+        scale = min(frame_size[0] / width, frame_size[1] / height)
+        if scale >= 1:
+            return frame
+        target_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv2.resize(frame, target_size, interpolation=cv2.INTER_AREA)
+
     def extract_captions(self) -> Path:
         try:
             self.logger.info(f"Extracting captions for video: {self.video_id}")
-            srt = YouTubeTranscriptApi.get_transcript(self.video_id)
+            if not self.subtitle_path.exists():
+                raise FileNotFoundError(
+                    f"No English captions were downloaded for video {self.video_id}"
+                )
+            # Parse the raw bytes; orjson validates UTF-8 itself
+            events = orjson.loads(self.subtitle_path.read_bytes()).get("events", [])
 
-            caption_file = (
-                Path(self.config["data_dir"]) / f"captions_{self.video_id}.txt"
-            )
-            caption_text = []
+            caption_file = self.data_dir / f"captions_{self.video_id}.txt"
+            num_entries = 0
 
-            for entry in srt:
-                start = entry["start"]
-                end = start + entry["duration"]
-                text = entry["text"].strip()
-                caption_text.append(f"<s> {start:.2f} | {end:.2f} | {text} </s>")
+            # Stream each line straight to the file instead of joining them
+            with caption_file.open("w", buffering=1 << 20) as caption_out:
+                for event in events:
+                    # Events without segments only carry window/styling information
+                    text = "".join(
+                        seg.get("utf8", "") for seg in event.get("segs", [])
+                    ).strip()
+                    if not text:
+                        continue
+                    start = event["tStartMs"] / 1000
+                    end = start + event.get("dDurationMs", 0) / 1000
+                    if num_entries:
+                        caption_out.write("\n")
+                    caption_out.write(f"<s> {start:.2f} | {end:.2f} | {text} </s>")
+                    num_entries += 1
 
-            caption_file.write_text("\n".join(caption_text))
-            self.logger.info(f"Captions saved with {len(caption_text)} entries")
+            self.logger.info(f"Captions saved with {num_entries} entries")
             return caption_file
         except Exception as e:
             self.logger.error(f"Failed to extract captions: {str(e)}")